@@ -7,22 +7,68 @@ python examples/copilot-sdk/basic_example.py
 """
 
 import asyncio
+import os
 import sys
 import random
-from typing import Optional
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Callable, Awaitable, TextIO
+
+from event_profiler import EventLoopProfiler
+
+# 選用的事件 handler 效能分析 (COPILOT_PROFILE=1)
+profiler = EventLoopProfiler.from_env()
+
+# ============================================================================
+# 範例輸出
+# ============================================================================
+
+class ScenarioOutput:
+    """範例的輸出目的地：直接寫到 stream，或收集起來供執行器分開顯示"""
+    
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+        self.parts: List[str] = []
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+    
+    def write(self, text: str):
+        if self.stream:
+            self.stream.write(text)
+            self.stream.flush()
+        else:
+            self.parts.append(text)
+    
+    def print(self, *args):
+        self.write(" ".join(str(a) for a in args) + "\n")
+    
+    def token(self, text: str):
+        """寫入模型輸出，並記錄第一個 token 的時間"""
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.started
+        self.write(text)
+    
+    def text(self) -> str:
+        return "".join(self.parts)
+
 
 # ============================================================================
 # 範例 1: 基本對話
 # ============================================================================
 
-async def basic_conversation():
+async def basic_conversation(client=None, out: Optional[ScenarioOutput] = None):
     """基本對話範例"""
     from copilot import CopilotClient
     
-    print("🚀 範例 1: 基本對話\n")
+    out = out or ScenarioOutput(sys.stdout)
+    out.print("🚀 範例 1: 基本對話\n")
     
-    client = CopilotClient()
-    await client.start()
+    own_client = client is None
+    if own_client:
+        client = CopilotClient()
+        await client.start()
     
     try:
         session = await client.create_session({
@@ -34,28 +80,33 @@ async def basic_conversation():
         })
         
         if response:
-            print(f"🤖 AI 回應: {response.data.content}")
+            # 非串流呼叫沒有首個 token 時間，因此不用 out.token
+            out.print(f"🤖 AI 回應: {response.data.content}")
         
         await session.destroy()
         return response.data.content if response else None
         
     finally:
-        await client.stop()
+        if own_client:
+            await client.stop()
 
 
 # ============================================================================
 # 範例 2: 串流回應
 # ============================================================================
 
-async def streaming_example():
+async def streaming_example(client=None, out: Optional[ScenarioOutput] = None):
     """串流回應範例"""
     from copilot import CopilotClient
     from copilot.generated.session_events import SessionEventType
     
-    print("\n🚀 範例 2: 串流回應\n")
+    out = out or ScenarioOutput(sys.stdout)
+    out.print("\n🚀 範例 2: 串流回應\n")
     
-    client = CopilotClient()
-    await client.start()
+    own_client = client is None
+    if own_client:
+        client = CopilotClient()
+        await client.start()
     
     try:
         session = await client.create_session({
@@ -66,14 +117,13 @@ async def streaming_example():
         # 設定串流事件處理
         def handle_event(event):
             if event.type == SessionEventType.ASSISTANT_MESSAGE_DELTA:
-                sys.stdout.write(event.data.delta_content or "")
-                sys.stdout.flush()
+                out.token(event.data.delta_content or "")
             if event.type == SessionEventType.SESSION_IDLE:
-                print("\n")
+                out.print("\n")
         
-        session.on(handle_event)
+        session.on(profiler.wrap("streaming_example.handle_event", handle_event))
         
-        sys.stdout.write("🤖 AI: ")
+        out.write("🤖 AI: ")
         await session.send_and_wait({
             "prompt": "寫一首關於程式設計的俳句"
         })
@@ -81,20 +131,22 @@ async def streaming_example():
         await session.destroy()
         
     finally:
-        await client.stop()
+        if own_client:
+            await client.stop()
 
 
 # ============================================================================
 # 範例 3: 自定義工具 - 部落格生成器
 # ============================================================================
 
-async def custom_tool_example():
+async def custom_tool_example(client=None, out: Optional[ScenarioOutput] = None):
     """自定義工具範例"""
     from pydantic import BaseModel, Field
     from copilot import CopilotClient, define_tool
     from copilot.generated.session_events import SessionEventType
     
-    print("\n🚀 範例 3: 自定義工具\n")
+    out = out or ScenarioOutput(sys.stdout)
+    out.print("\n🚀 範例 3: 自定義工具\n")
     
     # 定義參數模型
     class BlogOutlineParams(BaseModel):
@@ -106,6 +158,7 @@ async def custom_tool_example():
     
     # 定義部落格大綱工具
     @define_tool(description="為給定主題生成部落格文章大綱")
+    @profiler.tool
     def generate_blog_outline(params: BlogOutlineParams) -> dict:
         outline = {
             "title": f"深入解析：{params.topic}",
@@ -122,6 +175,7 @@ async def custom_tool_example():
     
     # 定義取得分類工具
     @define_tool(description="取得 BlogSys 的所有部落格分類")
+    @profiler.tool
     def fetch_blog_categories(params: EmptyParams) -> dict:
         return {
             "categories": [
@@ -132,8 +186,10 @@ async def custom_tool_example():
             ]
         }
     
-    client = CopilotClient()
-    await client.start()
+    own_client = client is None
+    if own_client:
+        client = CopilotClient()
+        await client.start()
     
     try:
         session = await client.create_session({
@@ -145,14 +201,13 @@ async def custom_tool_example():
         # 設定事件處理
         def handle_event(event):
             if event.type == SessionEventType.ASSISTANT_MESSAGE_DELTA:
-                sys.stdout.write(event.data.delta_content or "")
-                sys.stdout.flush()
+                out.token(event.data.delta_content or "")
             if event.type == SessionEventType.TOOL_EXECUTION_START:
-                print(f"\n⚙️  執行工具: {event.data.tool_name}")
+                out.print(f"\n⚙️  執行工具: {event.data.tool_name}")
             if event.type == SessionEventType.SESSION_IDLE:
-                print("\n")
+                out.print("\n")
         
-        session.on(handle_event)
+        session.on(profiler.wrap("custom_tool_example.handle_event", handle_event))
         
         await session.send_and_wait({
             "prompt": "請先取得 BlogSys 的分類，然後為「Web3 去中心化技術」這個主題生成一個 4 節的文章大綱"
@@ -161,62 +216,348 @@ async def custom_tool_example():
         await session.destroy()
         
     finally:
-        await client.stop()
+        if own_client:
+            await client.stop()
 
 
 # ============================================================================
 # 範例 4: MCP Server 整合
 # ============================================================================
 
-async def mcp_server_example():
-    """MCP Server 整合範例"""
-    from copilot import CopilotClient
-    from copilot.types import MCPServerConfig
+# Session 端使用的轉接程式：把 stdio 接到常駐 MCP Server 的 Unix socket
+UNIX_SOCKET_RELAY = """
+import socket, sys, threading
+sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+sock.connect(sys.argv[1])
+def pump():
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+reader = threading.Thread(target=pump)
+reader.start()
+for line in sys.stdin.buffer:
+    sock.sendall(line)
+sock.shutdown(socket.SHUT_WR)
+reader.join()
+"""
+
+
+@dataclass
+class MCPServerSpec:
+    """常駐 MCP Server 設定
+
+    transport:
+    - stdio: 一般 stdio Server，由池透過 Unix socket 轉接，一次只服務一個 Session
+    - unix:  Server 自行監聽 args 中的 {socket}
+    - http:  Server 自行監聽 args 中的 {port}，Session 以 URL 連線
+    """
+    name: str
+    command: str
+    args: List[str] = field(default_factory=list)
+    transport: str = "stdio"
+    port: int = 8800
+    max_sessions: int = 4
+    tools: List[str] = field(default_factory=lambda: ["*"])
+
+
+class PooledMCPServer:
+    """單一常駐 MCP Server 行程"""
     
-    print("\n🚀 範例 4: MCP Server 整合\n")
+    def __init__(self, spec: MCPServerSpec, index: int):
+        self.spec = spec
+        self.index = index
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.bridge = None
+        self.active = 0
+        self.ready = False
+        self.restarting = False
+        self.restarts = 0
+        self.port = spec.port + index
+        self.socket_path = os.path.join(
+            tempfile.gettempdir(), f"blogsys-mcp-{spec.name}-{index}-{os.getpid()}.sock"
+        )
     
-    client = CopilotClient()
-    await client.start()
+    @property
+    def max_sessions(self) -> int:
+        # stdio Server 只有一條管線，無法同時服務多個 MCP client
+        return 1 if self.spec.transport == "stdio" else self.spec.max_sessions
     
-    try:
-        # 設定 MCP Servers
-        mcp_servers: dict[str, MCPServerConfig] = {
-            "filesystem": {
-                "type": "local",
-                "command": "npx",
-                "args": ["-y", "@anthropic/mcp-filesystem", "./"],
-                "tools": ["*"],
+    async def start(self, timeout: float = 30.0):
+        """啟動行程並等待健康檢查通過"""
+        args = [arg.format(socket=self.socket_path, port=self.port) for arg in self.spec.args]
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        
+        if self.spec.transport == "stdio":
+            self.process = await asyncio.create_subprocess_exec(
+                self.spec.command, *args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+            )
+            self.bridge = await asyncio.start_unix_server(self._bridge, path=self.socket_path)
+        else:
+            self.process = await asyncio.create_subprocess_exec(self.spec.command, *args)
+        
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not await self.is_healthy():
+            if self.process.returncode is not None or asyncio.get_running_loop().time() > deadline:
+                await self.stop()
+                raise RuntimeError(f"MCP Server {self.spec.name}#{self.index} 啟動失敗")
+            await asyncio.sleep(0.1)
+        self.ready = True
+    
+    async def is_healthy(self) -> bool:
+        """行程存活且端點可連線"""
+        if self.process is None or self.process.returncode is not None:
+            return False
+        if self.spec.transport == "stdio":
+            # 探測 bridge 會被當成一個 Session，因此只檢查行程存活
+            return True
+        try:
+            if self.spec.transport == "unix":
+                _, writer = await asyncio.open_unix_connection(self.socket_path)
+            else:
+                _, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        except OSError:
+            return False
+        writer.close()
+        await writer.wait_closed()
+        return True
+    
+    async def stop(self):
+        """停止行程並清除 socket"""
+        self.ready = False
+        if self.bridge:
+            self.bridge.close()
+            self.bridge = None
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+    
+    async def restart(self):
+        """重新啟動 (崩潰或回收時)"""
+        await self.stop()
+        self.restarts += 1
+        await self.start()
+    
+    def config(self) -> dict:
+        """給 Session 使用的 MCPServerConfig"""
+        if self.spec.transport == "http":
+            return {
+                "type": "http",
+                "url": f"http://127.0.0.1:{self.port}/mcp",
+                "tools": self.spec.tools,
             }
+        return {
+            "type": "local",
+            "command": sys.executable,
+            "args": ["-c", UNIX_SOCKET_RELAY, self.socket_path],
+            "tools": self.spec.tools,
         }
+    
+    async def _bridge(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """把 Unix socket 連線轉接到 stdio Server 的 stdin/stdout"""
+        async def pump(source: asyncio.StreamReader, sink):
+            while data := await source.read(65536):
+                sink.write(data)
+                await sink.drain()
         
-        session = await client.create_session({
-            "mcp_servers": mcp_servers
-        })
+        upstream = asyncio.create_task(pump(reader, self.process.stdin))
+        downstream = asyncio.create_task(pump(self.process.stdout, writer))
+        try:
+            await asyncio.wait([upstream, downstream], return_when=asyncio.FIRST_COMPLETED)
+            # Session 關閉輸入後，保留片刻讓 Server 送完尚未回傳的回應
+            await asyncio.wait([downstream], timeout=1.0)
+        finally:
+            upstream.cancel()
+            downstream.cancel()
+            writer.close()
+
+
+class MCPServerPool:
+    """常駐 MCP Server 池：預先啟動、健康檢查、崩潰重啟、限制每個 Server 的 Session 數"""
+    
+    def __init__(
+        self,
+        specs: List[MCPServerSpec],
+        replicas: int = 1,
+        health_interval: float = 5.0,
+        lease_timeout: float = 60.0,
+    ):
+        self.servers: Dict[str, List[PooledMCPServer]] = {
+            spec.name: [PooledMCPServer(spec, i) for i in range(replicas)]
+            for spec in specs
+        }
+        self.health_interval = health_interval
+        self.lease_timeout = lease_timeout
+        self._condition = asyncio.Condition()
+        self._monitor: Optional[asyncio.Task] = None
+        self._recycling: set = set()
+    
+    async def start(self):
+        """並行啟動所有 Server 並開始健康監控"""
+        await asyncio.gather(*[s.start() for servers in self.servers.values() for s in servers])
+        self._monitor = asyncio.create_task(self._watch())
+        for name, servers in self.servers.items():
+            print(f"  ✓ MCP Server {name} x{len(servers)} 已預熱")
+    
+    async def stop(self):
+        """停止監控與所有 Server"""
+        for task in [self._monitor, *self._recycling]:
+            if task:
+                task.cancel()
+        await asyncio.gather(*[t for t in [self._monitor, *self._recycling] if t], return_exceptions=True)
+        await asyncio.gather(*[s.stop() for servers in self.servers.values() for s in servers])
+    
+    @asynccontextmanager
+    async def lease(self, name: str):
+        """借用一個 Server，取得其 MCPServerConfig；額滿時等待，逾時或沒有存活的 Server 時拋出 RuntimeError"""
+        servers = self.servers[name]
         
-        response = await session.send_and_wait({
-            "prompt": "讀取 README.md 檔案的內容並總結"
-        })
+        def available():
+            return [s for s in servers if s.ready and s.active < s.max_sessions]
         
-        if response:
-            print(f"🤖 AI: {response.data.content}")
+        def alive():
+            return any(s.ready or s.restarting for s in servers)
         
-        await session.destroy()
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: available() or not alive()),
+                    timeout=self.lease_timeout,
+                )
+            except asyncio.TimeoutError:
+                raise RuntimeError(f"等待 MCP Server {name} 逾時 ({self.lease_timeout:.0f}s)")
+            if not available():
+                raise RuntimeError(f"MCP Server {name} 沒有存活的行程")
+            server = min(available(), key=lambda s: s.active)
+            server.active += 1
+        try:
+            yield server.config()
+        finally:
+            async with self._condition:
+                server.active -= 1
+                if server.spec.transport == "stdio":
+                    # stdio Server 的 MCP 狀態屬於上一個 Session，背景回收換新行程
+                    self._schedule_recycle(server)
+                self._condition.notify_all()
+    
+    def _schedule_recycle(self, server: PooledMCPServer):
+        """在背景重新啟動 Server (已在重啟中則略過)"""
+        if server.restarting:
+            return
+        server.ready = False
+        server.restarting = True
+        task = asyncio.create_task(self._recycle(server))
+        self._recycling.add(task)
+        task.add_done_callback(self._recycling.discard)
+    
+    async def _recycle(self, server: PooledMCPServer):
+        server.restarting = True
+        try:
+            await server.restart()
+        except (RuntimeError, OSError) as e:
+            # 啟動失敗 (例如找不到 npx) 時保持未就緒，由下一輪健康檢查重試
+            print(f"⚠️ MCP Server {server.spec.name}#{server.index} 重啟失敗: {e}")
+        finally:
+            server.restarting = False
+        async with self._condition:
+            self._condition.notify_all()
+    
+    async def _watch(self):
+        """定期健康檢查，重啟崩潰的 Server"""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for servers in self.servers.values():
+                for server in servers:
+                    try:
+                        healthy = server.restarting or await server.is_healthy()
+                    except Exception as e:
+                        print(f"⚠️ MCP Server {server.spec.name}#{server.index} 健康檢查失敗: {e}")
+                        healthy = False
+                    if not healthy:
+                        print(f"⚠️ MCP Server {server.spec.name}#{server.index} 異常，重新啟動")
+                        self._schedule_recycle(server)
+
+
+# BlogSys 使用的檔案系統 MCP Server
+FILESYSTEM_MCP_SPEC = MCPServerSpec(
+    name="filesystem",
+    command="npx",
+    args=["-y", "@anthropic/mcp-filesystem", "./"],
+)
+
+
+async def mcp_server_example(client=None, out: Optional[ScenarioOutput] = None, pool: Optional[MCPServerPool] = None):
+    """MCP Server 整合範例 (傳入 pool 時改用常駐 Server，省去每次的啟動時間)"""
+    from copilot import CopilotClient
+    from copilot.types import MCPServerConfig
+    
+    out = out or ScenarioOutput(sys.stdout)
+    out.print("\n🚀 範例 4: MCP Server 整合\n")
+    
+    own_client = client is None
+    if own_client:
+        client = CopilotClient()
+        await client.start()
+    
+    try:
+        async with (pool.lease("filesystem") if pool else _cold_filesystem_config()) as filesystem:
+            # 設定 MCP Servers
+            mcp_servers: dict[str, MCPServerConfig] = {
+                "filesystem": filesystem,
+            }
+            
+            session = await client.create_session({
+                "mcp_servers": mcp_servers
+            })
+            
+            response = await session.send_and_wait({
+                "prompt": "讀取 README.md 檔案的內容並總結"
+            })
+            
+            if response:
+                out.print(f"🤖 AI: {response.data.content}")
+            
+            await session.destroy()
         
     finally:
-        await client.stop()
+        if own_client:
+            await client.stop()
+
+
+@asynccontextmanager
+async def _cold_filesystem_config():
+    """未使用池時，每個 Session 各自啟動 MCP Server"""
+    yield {
+        "type": "local",
+        "command": FILESYSTEM_MCP_SPEC.command,
+        "args": FILESYSTEM_MCP_SPEC.args,
+        "tools": FILESYSTEM_MCP_SPEC.tools,
+    }
 
 
 # ============================================================================
 # 範例 5: BlogSys AI 助手
 # ============================================================================
 
-async def blogsys_assistant_example():
+async def blogsys_assistant_example(client=None, out: Optional[ScenarioOutput] = None):
     """BlogSys AI 助手範例"""
     from copilot import CopilotClient
     from copilot.types import CustomAgentConfig
     from copilot.generated.session_events import SessionEventType
     
-    print("\n🚀 範例 5: BlogSys AI 助手\n")
+    out = out or ScenarioOutput(sys.stdout)
+    out.print("\n🚀 範例 5: BlogSys AI 助手\n")
     
     # 定義 BlogSys 專用 Agent
     custom_agents: list[CustomAgentConfig] = [
@@ -270,8 +611,10 @@ async def blogsys_assistant_example():
         }
     ]
     
-    client = CopilotClient()
-    await client.start()
+    own_client = client is None
+    if own_client:
+        client = CopilotClient()
+        await client.start()
     
     try:
         session = await client.create_session({
@@ -283,12 +626,11 @@ async def blogsys_assistant_example():
         # 設定事件處理
         def handle_event(event):
             if event.type == SessionEventType.ASSISTANT_MESSAGE_DELTA:
-                sys.stdout.write(event.data.delta_content or "")
-                sys.stdout.flush()
+                out.token(event.data.delta_content or "")
             if event.type == SessionEventType.SESSION_IDLE:
-                print("\n")
+                out.print("\n")
         
-        session.on(handle_event)
+        session.on(profiler.wrap("blogsys_assistant_example.handle_event", handle_event))
         
         # 使用 @agent 語法呼叫特定 Agent
         await session.send_and_wait({
@@ -298,7 +640,82 @@ async def blogsys_assistant_example():
         await session.destroy()
         
     finally:
-        await client.stop()
+        if own_client:
+            await client.stop()
+
+
+# ============================================================================
+# 範例執行器
+# ============================================================================
+
+Scenario = Callable[[Any, ScenarioOutput], Awaitable[Any]]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    output: str
+    wall_time: float
+    first_token: Optional[float] = None
+    error: Optional[BaseException] = None
+
+
+class ScenarioRunner:
+    """共用一個 CopilotClient 並行執行互相獨立的範例，各自收集輸出與計時"""
+    
+    def __init__(self):
+        self.scenarios: List[tuple] = []
+    
+    def register(self, name: str, scenario: Scenario, exclusive: bool = False):
+        """註冊範例；exclusive=True 的範例會在並行批次後單獨執行"""
+        self.scenarios.append((name, scenario, exclusive))
+    
+    async def run(self) -> List[ScenarioResult]:
+        from copilot import CopilotClient
+        
+        client = CopilotClient()
+        await client.start()
+        
+        try:
+            results = list(await asyncio.gather(*[
+                self._run_one(name, scenario, client)
+                for name, scenario, exclusive in self.scenarios if not exclusive
+            ]))
+            for name, scenario, exclusive in self.scenarios:
+                if exclusive:
+                    results.append(await self._run_one(name, scenario, client))
+            return results
+        finally:
+            await client.stop()
+    
+    async def _run_one(self, name: str, scenario: Scenario, client) -> ScenarioResult:
+        out = ScenarioOutput()
+        error = None
+        try:
+            await scenario(client, out)
+        except Exception as e:
+            error = e
+        return ScenarioResult(
+            name=name,
+            output=out.text(),
+            wall_time=time.perf_counter() - out.started,
+            first_token=out.first_token,
+            error=error,
+        )
+    
+    @staticmethod
+    def report(results: List[ScenarioResult]):
+        """依序輸出各範例的內容與計時"""
+        for result in results:
+            print(result.output.rstrip("\n") + "\n")
+        
+        print("=" * 60)
+        print("⏱️ 範例計時")
+        print("=" * 60)
+        for result in results:
+            status = "✅" if result.error is None else f"❌ {result.error}"
+            ttft = f"{result.first_token:.2f}s" if result.first_token is not None else "-"
+            print(f"  {result.name:<12} 總時間 {result.wall_time:6.2f}s  首個 token {ttft:>7}  {status}")
 
 
 # ============================================================================
@@ -311,12 +728,34 @@ async def main():
     print("🎮 BlogSys Copilot SDK Python 範例集")
     print("=" * 60)
     
+    runner = ScenarioRunner()
+    runner.register("basic", basic_conversation)
+    runner.register("streaming", streaming_example)
+    runner.register("custom-tool", custom_tool_example)
+    runner.register("assistant", blogsys_assistant_example)
+    
+    # MCP 範例需要安裝 MCP server，設定 COPILOT_MCP=1 啟用並使用預熱的常駐 Server 池
+    pool = MCPServerPool([FILESYSTEM_MCP_SPEC]) if os.environ.get("COPILOT_MCP") == "1" else None
+    pool_started: Optional[asyncio.Task] = None
+    
+    async def pooled_mcp_example(client, out: ScenarioOutput):
+        # 池在背景預熱；啟動失敗 (例如找不到 npx) 只記為此範例的錯誤
+        await pool_started
+        await mcp_server_example(client, out, pool)
+    
+    if pool:
+        runner.register("mcp", pooled_mcp_example)
+    
     try:
-        await basic_conversation()
-        await streaming_example()
-        await custom_tool_example()
-        # await mcp_server_example()  # 需要安裝 MCP server
-        await blogsys_assistant_example()
+        await profiler.start()
+        if pool:
+            pool_started = asyncio.create_task(pool.start())
+        results = await runner.run()
+        runner.report(results)
+        
+        failed = [r for r in results if r.error]
+        if failed:
+            raise failed[0].error
         
         print("\n✅ 所有範例執行完成！")
         
@@ -327,6 +766,15 @@ async def main():
     except Exception as e:
         print(f"\n❌ 範例執行失敗: {e}")
         raise
+        
+    finally:
+        if pool_started:
+            await asyncio.gather(pool_started, return_exceptions=True)
+        if pool:
+            await pool.stop()
+        await profiler.stop()
+        profiler.report()
+        profiler.dump("examples-profile")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+"""
+⏱️ Session 事件處理效能分析器
+
+Session 的事件 handler 與工具函式都在 SDK 的事件分派中同步執行，
+任何一個慢的 handler 都會拖住同一個 event loop 上的所有 Session。
+此模組提供選用的分析模式：
+- 量測每個 handler / 工具的執行時間，標記超過門檻的呼叫
+- 取樣 event loop 延遲 (lag)
+- 輸出 collapsed-stack 火焰圖檔 (flamegraph.pl / speedscope 可讀)：
+  每條堆疊是「SDK 分派到該 handler 的呼叫路徑 + handler 名稱」，權重為 handler
+  的累計耗時 (微秒)。它呈現哪些 handler、從哪條分派路徑吃掉最多 loop 時間，
+  不會拆解 handler 內部的耗時；堆疊依呼叫位置快取，只在第一次遇到時擷取
+- 輸出 CI benchmark 用的 JSON (customSmallerIsBetter 格式)
+
+啟用方式：
+COPILOT_PROFILE=1 python multi_agent_factory.py
+
+環境變數：
+- COPILOT_PROFILE: 設為 1 啟用
+- COPILOT_PROFILE_THRESHOLD_MS: 慢速 handler 門檻，預設 5
+- COPILOT_PROFILE_DIR: 輸出目錄，預設為目前目錄
+"""
+
+import asyncio
+import functools
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Optional, List, Dict, Callable
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """以 nearest-rank 法計算百分位數"""
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class EventLoopProfiler:
+    """包裝事件 handler 與工具函式，統計執行時間與 event loop 延遲"""
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        threshold: float = 0.005,
+        lag_interval: float = 0.05,
+        output_dir: str = ".",
+    ):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.lag_interval = lag_interval
+        self.output_dir = output_dir
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.slow_calls: Dict[str, int] = defaultdict(int)
+        self.stacks: Dict[str, float] = defaultdict(float)
+        self._stack_cache: Dict[tuple, str] = {}
+        self.loop_lag: List[float] = []
+        self._sampler: Optional[asyncio.Task] = None
+    
+    @classmethod
+    def from_env(cls) -> "EventLoopProfiler":
+        """依環境變數建立；未設定 COPILOT_PROFILE 時為停用狀態"""
+        return cls(
+            enabled=os.environ.get("COPILOT_PROFILE") == "1",
+            threshold=float(os.environ.get("COPILOT_PROFILE_THRESHOLD_MS", "5")) / 1000,
+            output_dir=os.environ.get("COPILOT_PROFILE_DIR", "."),
+        )
+    
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """包裝 handler；停用時原樣回傳"""
+        if not self.enabled:
+            return func
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record(name, time.perf_counter() - started)
+        
+        return wrapper
+    
+    def tool(self, func: Callable) -> Callable:
+        """工具函式用的裝飾器，放在 @define_tool 之下"""
+        return self.wrap(f"tool.{func.__name__}", func)
+    
+    def _record(self, name: str, seconds: float):
+        self.durations[name].append(seconds)
+        if seconds > self.threshold:
+            self.slow_calls[name] += 1
+        # 依呼叫位置 (handler, 呼叫端程式碼與行號) 快取 collapsed stack，
+        # 避免每次呼叫都走訪整條堆疊而在 event loop 上製造額外延遲
+        caller = sys._getframe(2)
+        key = (name, caller.f_code, caller.f_lineno)
+        stack = self._stack_cache.get(key)
+        if stack is None:
+            stack = self._stack_cache[key] = self._collapse(caller, name)
+        self.stacks[stack] += seconds * 1_000_000
+    
+    @staticmethod
+    def _collapse(frame, name: str) -> str:
+        frames = []
+        while frame is not None:
+            frames.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)})")
+            frame = frame.f_back
+        return ";".join(reversed(frames)) + f";{name}"
+    
+    async def start(self):
+        """開始取樣 event loop 延遲"""
+        if self.enabled and self._sampler is None:
+            self._sampler = asyncio.create_task(self._sample_lag())
+    
+    async def stop(self):
+        if self._sampler:
+            self._sampler.cancel()
+            await asyncio.gather(self._sampler, return_exceptions=True)
+            self._sampler = None
+    
+    async def _sample_lag(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            self.loop_lag.append(max(0.0, time.perf_counter() - started - self.lag_interval))
+    
+    def report(self):
+        """輸出各 handler 的耗時統計與慢速呼叫"""
+        if not self.enabled:
+            return
+        print("\n" + "=" * 60)
+        print("⏱️ 事件 handler 效能分析")
+        print("=" * 60)
+        for name, values in sorted(self.durations.items(), key=lambda kv: -sum(kv[1])):
+            flag = f"  🐢 慢速 x{self.slow_calls[name]}" if self.slow_calls[name] else ""
+            print(
+                f"  {name}: n={len(values)} "
+                f"total={sum(values) * 1000:.1f}ms "
+                f"p95={percentile(values, 95) * 1000:.2f}ms "
+                f"max={max(values) * 1000:.2f}ms{flag}"
+            )
+        if self.loop_lag:
+            print(
+                f"\n  event loop lag: p50={percentile(self.loop_lag, 50) * 1000:.1f}ms "
+                f"p99={percentile(self.loop_lag, 99) * 1000:.1f}ms "
+                f"max={max(self.loop_lag) * 1000:.1f}ms"
+            )
+    
+    def dump(self, name: str) -> List[str]:
+        """寫出 collapsed-stack 火焰圖與 benchmark JSON，回傳檔案路徑"""
+        if not self.enabled:
+            return []
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        flamegraph_path = os.path.join(self.output_dir, f"{name}.collapsed")
+        with open(flamegraph_path, "w", encoding="utf-8") as f:
+            for stack, micros in sorted(self.stacks.items()):
+                f.write(f"{stack} {max(1, round(micros))}\n")
+        
+        benchmarks = []
+        for handler, values in sorted(self.durations.items()):
+            benchmarks.append({"name": f"{handler} p95", "unit": "ms", "value": percentile(values, 95) * 1000})
+            benchmarks.append({"name": f"{handler} total", "unit": "ms", "value": sum(values) * 1000})
+        if self.loop_lag:
+            benchmarks.append({"name": "event loop lag p99", "unit": "ms", "value": percentile(self.loop_lag, 99) * 1000})
+        
+        benchmark_path = os.path.join(self.output_dir, f"{name}-benchmark.json")
+        with open(benchmark_path, "w", encoding="utf-8") as f:
+            json.dump(benchmarks, f, ensure_ascii=False, indent=2)
+        
+        print(f"\n🔥 火焰圖: {flamegraph_path}")
+        print(f"📈 Benchmark: {benchmark_path}")
+        return [flamegraph_path, benchmark_path]
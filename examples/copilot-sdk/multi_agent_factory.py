@@ -26,13 +26,22 @@ python multi_agent_factory.py
 """
 
 import asyncio
+import hashlib
+import itertools
+import json
+import os
 import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 
+from event_profiler import EventLoopProfiler, percentile
+
 
 # ============================================================================
 # 📦 資料模型
@@ -62,11 +71,212 @@ class Task:
     result: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.now)
     completed_at: Optional[datetime] = None
+    item: Optional[str] = None  # 所屬需求項目的雜湊
+    files: Dict[str, str] = field(default_factory=dict)
+    reused: bool = False
+
+
+def content_hash(text: str) -> str:
+    """正規化空白後計算內容雜湊"""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def task_hash(type: TaskType, description: str) -> str:
+    """任務輸入 (類型 + 描述) 的雜湊"""
+    return content_hash(f"{TaskType(type).value}:{description}")
+
+
+def split_requirement(requirement: str) -> Tuple[str, List[str]]:
+    """將需求拆成上下文雜湊與逐行的需求項目
 
+    每行一個項目；以冒號結尾的標題行 (如「為 BlogSys 開發…功能：」) 只作為上下文，
+    不視為項目，但會計入上下文雜湊；沒有文字內容的行 (如分隔線) 直接略過。
+    """
+    context, items = [], []
+    for line in requirement.strip().splitlines():
+        line = line.strip()
+        if not any(ch.isalnum() for ch in line):
+            continue
+        if line.endswith(("：", ":")):
+            context.append(line)
+        else:
+            items.append(line)
+    return content_hash("\n".join(context)), items
 
-# 共享任務隊列
-task_queue: List[Task] = []
-completed_tasks: List[Task] = []
+
+class TaskBoard:
+    """單一開發週期專屬的任務隊列與 ID 產生器"""
+    
+    def __init__(self, cycle_id: str):
+        self.cycle_id = cycle_id
+        self.task_queue: List[Task] = []
+        self.completed_tasks: List[Task] = []
+        self._ids = itertools.count(1)
+        # 增量模式：需求項目 (雜湊 -> 內容)、本次送給監工的項目編號 (編號 -> 雜湊)、可沿用的任務結果
+        self.items: Dict[str, str] = {}
+        self.item_labels: Dict[int, str] = {}
+        self.cached: Dict[str, dict] = {}
+    
+    def create(self, type: TaskType, description: str, item: Optional[str] = None) -> Task:
+        task = Task(
+            id=f"{self.cycle_id}-task-{next(self._ids)}",
+            type=type,
+            description=description,
+            item=item,
+        )
+        record = self.cached.get(task_hash(type, description))
+        if record:
+            self._reuse(task, record)
+        self.task_queue.append(task)
+        return task
+    
+    def item_for(self, label: Optional[int]) -> Optional[str]:
+        """把監工回報的項目編號對應到需求項目；只有一個變更項目時可省略編號"""
+        if label in self.item_labels:
+            return self.item_labels[label]
+        if len(self.item_labels) == 1:
+            return next(iter(self.item_labels.values()))
+        return None
+    
+    def restore(self, item: str, record: dict) -> Task:
+        """還原上一次週期完成的任務"""
+        task = Task(
+            id=f"{self.cycle_id}-task-{next(self._ids)}",
+            type=TaskType(record["type"]),
+            description=record["description"],
+            item=item,
+        )
+        self._reuse(task, record)
+        self.task_queue.append(task)
+        return task
+    
+    def _reuse(self, task: Task, record: dict):
+        task.status = TaskStatus.COMPLETED
+        task.result = record["result"]
+        task.files = dict(record["files"])
+        task.completed_at = datetime.now()
+        task.reused = True
+        self.completed_tasks.append(task)
+    
+    def fresh_tasks(self) -> List[Task]:
+        """本次週期需要實際執行的任務"""
+        return [t for t in self.task_queue if not t.reused]
+    
+    def invalidate_tests(self):
+        """測試依賴所有開發任務：有開發任務重新執行時，沿用的測試任務改回待處理"""
+        if not any(t.type != TaskType.TEST for t in self.fresh_tasks()):
+            return
+        for task in self.task_queue:
+            if task.type == TaskType.TEST and task.reused:
+                task.status = TaskStatus.PENDING
+                task.result = None
+                task.completed_at = None
+                task.reused = False
+                self.completed_tasks.remove(task)
+    
+    def claim(self, worker_id: str, preferred_type: Optional[TaskType] = None) -> Optional[Task]:
+        for task in self.task_queue:
+            if task.status == TaskStatus.PENDING:
+                if preferred_type is None or task.type == preferred_type:
+                    task.status = TaskStatus.IN_PROGRESS
+                    task.assignee = worker_id
+                    return task
+        return None
+    
+    def release(self, task: Task):
+        """把尚未完成的任務退回待處理 (被淘汰的對沖請求所領取的任務)，並丟棄其寫入的檔案"""
+        if task.status == TaskStatus.IN_PROGRESS:
+            task.status = TaskStatus.PENDING
+            task.assignee = None
+            task.files = {}
+    
+    def complete(self, task_id: str, result: str) -> Optional[Task]:
+        for task in self.task_queue:
+            if task.id == task_id:
+                task.status = TaskStatus.COMPLETED
+                task.result = result
+                task.completed_at = datetime.now()
+                self.completed_tasks.append(task)
+                return task
+        return None
+    
+    def count(self, status: TaskStatus) -> int:
+        return len([t for t in self.task_queue if t.status == status])
+
+
+class CycleCache:
+    """以 JSON 保存上一次開發週期的需求項目、任務結果與產生的檔案"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.context: Optional[str] = None
+        self.items: Dict[str, dict] = {}
+        self.test_report: Optional[str] = None
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.context = data.get("context")
+            self.items = data.get("items", {})
+            self.test_report = data.get("test_report")
+    
+    def plan(self, board: TaskBoard, requirement: str) -> List[str]:
+        """還原未變更需求項目的任務，回傳需要重新拆解的項目雜湊
+
+        項目雜湊包含需求上下文 (標題行)；上下文改變時所有項目都視為變更，
+        也不沿用任何任務結果。
+        """
+        context, texts = split_requirement(requirement)
+        self.context, previous = context, self.context
+        board.cached = {
+            task_hash(record["type"], record["description"]): record
+            for item in self.items.values()
+            for record in item["tasks"]
+            if record["type"] != TaskType.TEST
+        } if context == previous else {}
+        changed = []
+        for text in texts:
+            item = content_hash(f"{context}\n{text}")
+            if item in board.items:
+                continue
+            board.items[item] = text
+            if item in self.items:
+                for record in self.items[item]["tasks"]:
+                    board.restore(item, record)
+            else:
+                changed.append(item)
+        return changed
+    
+    def save(self, board: TaskBoard, test_report: Optional[str]):
+        """保存任務全部完成的需求項目
+
+        沒有任何任務歸屬的項目 (例如監工未填項目編號) 不保存，下次會重新送給監工拆解。
+        """
+        self.items = {}
+        for item, text in board.items.items():
+            tasks = [t for t in board.task_queue if t.item == item]
+            if not tasks or any(t.status != TaskStatus.COMPLETED for t in tasks):
+                continue
+            self.items[item] = {
+                "text": text,
+                "tasks": [
+                    {
+                        "type": t.type.value,
+                        "description": t.description,
+                        "result": t.result,
+                        "files": t.files,
+                    }
+                    for t in tasks
+                ],
+            }
+        self.test_report = test_report
+        
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"context": self.context, "items": self.items, "test_report": test_report},
+                f, ensure_ascii=False, indent=2,
+            )
 
 
 # ============================================================================
@@ -76,6 +286,7 @@ completed_tasks: List[Task] = []
 class CreateTaskParams(BaseModel):
     type: TaskType = Field(description="任務類型")
     description: str = Field(description="任務描述")
+    item: Optional[int] = Field(default=None, description="對應的需求項目編號 (需求中以 [n] 標示時填寫)")
 
 
 class ClaimTaskParams(BaseModel):
@@ -179,6 +390,130 @@ TESTER_PROMPT = """你是自動化測試 Worker。
 4. 用 complete_task 回報完成"""
 
 
+# ============================================================================
+# 🧭 模型路由 (延遲感知 + 對沖請求)
+# ============================================================================
+
+# 可用模型與品質等級 (數字越大品質越高)，順序即為冷啟動時的探索順序
+MODEL_TIERS: Dict[str, int] = {
+    "gpt-5": 3,
+    "claude-sonnet-4.5": 3,
+    "gpt-4.1": 2,
+    "gpt-5-mini": 1,
+}
+
+# 各 Agent 要求的最低品質等級
+ROLE_MIN_TIERS: Dict[str, int] = {
+    "supervisor": 3,
+    "worker-frontend": 2,
+    "worker-backend": 2,
+    "worker-styling": 2,
+    "tester": 1,
+}
+
+
+class ModelRouter:
+    """依 (模型, Agent) 的滾動延遲百分位數，挑選符合品質等級中最快的模型
+
+    樣本只保留 max_age 秒內的資料：一次慢速爆發過期後，該模型會重新被探索；
+    另有 probe_rate 的機率改送非最快的模型，持續更新其延遲。
+    被對沖淘汰的請求只知道延遲下限，另外記錄：它只會抬高該模型的排序分數，
+    不列入百分位數樣本。
+    """
+    
+    def __init__(
+        self,
+        window: int = 50,
+        max_age: float = 600.0,
+        min_samples: int = 1,
+        probe_rate: float = 0.1,
+        hedge_min_samples: int = 10,
+        cold_hedge_delay: float = 30.0,
+    ):
+        self.window = window
+        self.max_age = max_age
+        self.min_samples = min_samples
+        self.probe_rate = probe_rate
+        # 樣本少於 hedge_min_samples 時 p95 等同最大值，改用固定的 cold_hedge_delay 觸發對沖
+        self.hedge_min_samples = hedge_min_samples
+        self.cold_hedge_delay = cold_hedge_delay
+        self.latencies: Dict[tuple, deque] = {}
+        self.cancelled: Dict[tuple, deque] = {}
+    
+    def record(self, model: str, agent_id: str, seconds: float):
+        """記錄一次回應延遲"""
+        self._append(self.latencies, model, agent_id, seconds)
+    
+    def record_cancelled(self, model: str, agent_id: str, seconds: float):
+        """記錄被對沖淘汰的請求已等待的時間 (延遲下限)"""
+        self._append(self.cancelled, model, agent_id, seconds)
+    
+    def _append(self, store: Dict[tuple, deque], model: str, agent_id: str, seconds: float):
+        key = (model, agent_id)
+        if key not in store:
+            store[key] = deque(maxlen=self.window)
+        store[key].append((time.monotonic(), seconds))
+    
+    def samples(self, model: str, agent_id: str) -> List[float]:
+        """未過期的延遲樣本"""
+        return self._fresh(self.latencies, model, agent_id)
+    
+    def _fresh(self, store: Dict[tuple, deque], model: str, agent_id: str) -> List[float]:
+        now = time.monotonic()
+        return [s for t, s in store.get((model, agent_id), ()) if now - t <= self.max_age]
+    
+    def score(self, model: str, agent_id: str) -> Optional[float]:
+        """排序用分數 = max(p95, 淘汰請求的延遲下限)；從未回應也從未被淘汰時回傳 None"""
+        samples = self.samples(model, agent_id)
+        bounds = self._fresh(self.cancelled, model, agent_id)
+        if len(samples) < self.min_samples and not bounds:
+            return None
+        return max(bounds + ([percentile(samples, 95)] if samples else []))
+    
+    def candidates(self, agent_id: str) -> List[str]:
+        """符合該 Agent 品質等級的模型"""
+        min_tier = ROLE_MIN_TIERS.get(agent_id, 1)
+        return [model for model, tier in MODEL_TIERS.items() if tier >= min_tier]
+    
+    def pick(self, agent_id: str, exclude: Optional[set] = None) -> Optional[str]:
+        """挑選模型：先探索樣本不足或已過期的模型，之後選分數最低者 (偶爾重新探測其他模型)"""
+        models = [m for m in self.candidates(agent_id) if m not in (exclude or set())]
+        if not models:
+            return None
+        for model in models:
+            if self.score(model, agent_id) is None:
+                return model
+        best = min(models, key=lambda m: self.score(m, agent_id))
+        others = [m for m in models if m != best]
+        if others and random.random() < self.probe_rate:
+            return random.choice(others)
+        return best
+    
+    def hedge_delay(self, model: str, agent_id: str) -> float:
+        """對沖觸發時間 = 主要模型的 p95；樣本不足 hedge_min_samples 時使用 cold_hedge_delay"""
+        samples = self.samples(model, agent_id)
+        if len(samples) < self.hedge_min_samples:
+            return self.cold_hedge_delay
+        return percentile(samples, 95)
+    
+    def summary(self) -> List[str]:
+        """延遲統計報表"""
+        lines = []
+        for model, agent_id in sorted(self.latencies):
+            values = self.samples(model, agent_id)
+            if not values:
+                continue
+            cancelled = len(self._fresh(self.cancelled, model, agent_id))
+            lines.append(
+                f"{agent_id} @ {model}: n={len(values)} "
+                f"p50={percentile(values, 50):.1f}s "
+                f"p95={percentile(values, 95):.1f}s "
+                f"p99={percentile(values, 99):.1f}s"
+                + (f" 淘汰={cancelled}" if cancelled else "")
+            )
+        return lines
+
+
 # ============================================================================
 # 🏭 Multi-Agent Factory
 # ============================================================================
@@ -186,67 +521,115 @@ TESTER_PROMPT = """你是自動化測試 Worker。
 class MultiAgentFactory:
     """多 Agent 協作開發工廠"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        hedge_roles: Optional[set] = None,
+        replicas: int = 1,
+        profiler: Optional[EventLoopProfiler] = None,
+    ):
         self.client = None
         self.agents: Dict[str, Any] = {}
+        self.router = ModelRouter()
+        # 啟用對沖的 Agent；被淘汰的請求所領取但未完成的任務會退回待處理
+        self.hedge_roles = hedge_roles or set()
+        # 每個 Agent 的 Session 副本數，由所有並行的開發週期共用
+        self.replicas = replicas
+        self._cycle_ids = itertools.count(1)
+        # 選用的事件 handler 效能分析 (COPILOT_PROFILE=1)
+        self.profiler = profiler or EventLoopProfiler.from_env()
     
     async def initialize(self):
         """初始化所有 Agent"""
-        from copilot import CopilotClient, define_tool
+        from copilot import CopilotClient
         
         print("🏭 初始化多 Agent 開發工廠...\n")
         
         self.client = CopilotClient()
         await self.client.start()
+        await self.profiler.start()
+        
+        # 建立 Agents
+        agent_configs = [
+            ("supervisor", "監工", SUPERVISOR_PROMPT),
+            ("worker-frontend", "前端開發", WORKER_FRONTEND_PROMPT),
+            ("worker-backend", "後端開發", WORKER_BACKEND_PROMPT),
+            ("worker-styling", "樣式設計", WORKER_STYLING_PROMPT),
+            ("tester", "測試員", TESTER_PROMPT),
+        ]
+        
+        for agent_id, role, prompt in agent_configs:
+            agent = {
+                "role": role,
+                "prompt": prompt,
+                "slots": [],
+                "idle": asyncio.Queue(),
+            }
+            self.agents[agent_id] = agent
+            model = self.router.pick(agent_id)
+            for _ in range(self.replicas):
+                slot = {"sessions": {}, "contexts": {}, "board": None, "owner": None}
+                await self.get_session(agent_id, slot, model)
+                agent["slots"].append(slot)
+                agent["idle"].put_nowait(slot)
+            print(f"  ✓ {role} ({agent_id}) x{self.replicas} 已上線 [{model}]")
+        
+        print("\n✅ 所有 Agent 已就位！\n")
+        print("=" * 60)
+    
+    def build_tools(self, slot: dict, context: dict) -> List[Any]:
+        """定義綁定在單一 Session 上的工具
+
+        任務操作作用於副本目前所屬週期的 TaskBoard；context 記錄此 Session
+        本次請求領取的任務，讓被對沖淘汰的請求能把任務退回。
+        """
+        from copilot import define_tool
         
-        # 定義工具
         @define_tool(description="建立新的開發任務")
+        @self.profiler.tool
         def create_task(params: CreateTaskParams) -> dict:
-            task = Task(
-                id=f"task-{len(task_queue)+1}",
-                type=params.type,
-                description=params.description,
-            )
-            task_queue.append(task)
+            board = slot["board"]
+            task = board.create(params.type, params.description, board.item_for(params.item))
             return {"task_id": task.id, "message": f"任務已建立: {params.description}"}
         
         @define_tool(description="領取待處理的任務")
+        @self.profiler.tool
         def claim_task(params: ClaimTaskParams) -> dict:
-            for task in task_queue:
-                if task.status == TaskStatus.PENDING:
-                    if params.preferred_type is None or task.type == params.preferred_type:
-                        task.status = TaskStatus.IN_PROGRESS
-                        task.assignee = params.worker_id
-                        return {"task": vars(task), "message": f"任務已分配給 {params.worker_id}"}
+            task = slot["board"].claim(params.worker_id, params.preferred_type)
+            context["task"] = task
+            if task:
+                context["claimed"].append(task)
+                return {"task": vars(task), "message": f"任務已分配給 {params.worker_id}"}
             return {"task": None, "message": "目前沒有可領取的任務"}
         
         @define_tool(description="標記任務為已完成")
+        @self.profiler.tool
         def complete_task(params: CompleteTaskParams) -> dict:
-            for task in task_queue:
-                if task.id == params.task_id:
-                    task.status = TaskStatus.COMPLETED
-                    task.result = params.result
-                    task.completed_at = datetime.now()
-                    completed_tasks.append(task)
-                    return {"success": True, "message": f"任務 {params.task_id} 已完成"}
+            if slot["board"].complete(params.task_id, params.result):
+                return {"success": True, "message": f"任務 {params.task_id} 已完成"}
             return {"success": False, "message": "找不到任務"}
         
         @define_tool(description="查看所有任務的狀態")
+        @self.profiler.tool
         def get_task_status(params: EmptyParams) -> dict:
+            board = slot["board"]
             return {
-                "pending": len([t for t in task_queue if t.status == TaskStatus.PENDING]),
-                "in_progress": len([t for t in task_queue if t.status == TaskStatus.IN_PROGRESS]),
-                "completed": len(completed_tasks),
+                "pending": board.count(TaskStatus.PENDING),
+                "in_progress": board.count(TaskStatus.IN_PROGRESS),
+                "completed": len(board.completed_tasks),
             }
         
         @define_tool(description="寫入程式碼到檔案")
+        @self.profiler.tool
         def write_code(params: WriteCodeParams) -> dict:
             print(f"\n📝 [寫入檔案] {params.file_path}")
             print(f"   描述: {params.description}")
             print(f"   程式碼長度: {len(params.code)} 字元\n")
+            if context["task"]:
+                context["task"].files[params.file_path] = params.code
             return {"success": True, "file_path": params.file_path}
         
         @define_tool(description="執行自動化測試")
+        @self.profiler.tool
         def run_tests(params: RunTestsParams) -> dict:
             print(f"\n🧪 [執行測試] {params.test_type} tests")
             passed = random.random() > 0.2
@@ -257,44 +640,99 @@ class MultiAgentFactory:
                 "coverage": f"{random.randint(70, 100)}%",
             }
         
-        tools = [create_task, claim_task, complete_task, get_task_status, write_code, run_tests]
-        
-        # 建立 Agents
-        agent_configs = [
-            ("supervisor", "監工", SUPERVISOR_PROMPT),
-            ("worker-frontend", "前端開發", WORKER_FRONTEND_PROMPT),
-            ("worker-backend", "後端開發", WORKER_BACKEND_PROMPT),
-            ("worker-styling", "樣式設計", WORKER_STYLING_PROMPT),
-            ("tester", "測試員", TESTER_PROMPT),
-        ]
-        
-        for agent_id, role, prompt in agent_configs:
-            session = await self.client.create_session({
-                "model": "gpt-4.1",
+        return [create_task, claim_task, complete_task, get_task_status, write_code, run_tests]
+    
+    async def get_session(self, agent_id: str, slot: dict, model: str):
+        """取得副本在指定模型上的 Session，不存在時建立"""
+        if model not in slot["sessions"]:
+            context = {"task": None, "claimed": []}
+            slot["contexts"][model] = context
+            slot["sessions"][model] = await self.client.create_session({
+                "model": model,
                 "streaming": True,
-                "tools": tools,
+                "tools": self.build_tools(slot, context),
                 "system_message": {
                     "mode": "append",
-                    "content": prompt,
+                    "content": self.agents[agent_id]["prompt"],
                 },
             })
-            self.agents[agent_id] = {
-                "session": session,
-                "role": role,
-            }
-            print(f"  ✓ {role} ({agent_id}) 已上線")
-        
-        print("\n✅ 所有 Agent 已就位！\n")
-        print("=" * 60)
+        return slot["sessions"][model]
     
-    async def send_to_agent(self, agent_id: str, message: str) -> str:
-        """發送訊息給特定 Agent"""
-        from copilot.generated.session_events import SessionEventType
-        
+    @asynccontextmanager
+    async def lease(self, agent_id: str, board: TaskBoard):
+        """向共用池借用 Agent 副本
+        
+        等待者依 FIFO 取得副本；每個週期對同一 Agent 一次只排一個請求，
+        因此多個週期會輪流使用副本，不會有週期被餓死。
+        副本記錄最後使用它的週期，同一週期內沿用既有 Session；改由其他週期借用時
+        才重置，下一個週期不會看到前一個週期的對話。多個週期並行而輪流借用同一
+        副本時，每次換手仍會重置。
+        """
+        agent = self.agents[agent_id]
+        slot = await agent["idle"].get()
+        try:
+            if slot["owner"] is not None and slot["owner"] is not board:
+                await self._reset_slot(slot)
+            slot["owner"] = slot["board"] = board
+            yield slot
+        finally:
+            slot["board"] = None
+            agent["idle"].put_nowait(slot)
+    
+    async def _reset_slot(self, slot: dict):
+        """銷毀副本上的 Session；新的 Session 在下次發送時依當下挑選的模型建立"""
+        sessions = list(slot["sessions"].values())
+        slot["sessions"] = {}
+        slot["contexts"] = {}
+        slot["owner"] = None
+        await asyncio.gather(*[session.destroy() for session in sessions], return_exceptions=True)
+    
+    async def send_to_agent(self, agent_id: str, message: str, board: TaskBoard) -> str:
+        """發送訊息給特定 Agent (依延遲路由，必要時對沖)"""
         agent = self.agents.get(agent_id)
         if not agent:
             raise ValueError(f"Agent {agent_id} 不存在")
         
+        async with self.lease(agent_id, board) as slot:
+            primary = self.router.pick(agent_id)
+            attempts = {asyncio.create_task(self._send_once(agent_id, slot, primary, message)): primary}
+            
+            # 主要請求超過 p95 仍未完成時，對第二快的模型發出重複請求
+            hedged = agent_id in self.hedge_roles
+            delay = self.router.hedge_delay(primary, agent_id) if hedged else None
+            backup = self.router.pick(agent_id, exclude={primary}) if hedged else None
+            if backup:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done:
+                    print(f"  ⏱️ {agent['role']} 超過對沖門檻 ({delay:.1f}s)，對沖至 {backup}")
+                    attempts[asyncio.create_task(self._send_once(agent_id, slot, backup, message))] = backup
+            
+            # 取最先成功的回應，取消其餘請求
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for attempt in done:
+                        if attempt.exception() is None:
+                            return attempt.result()
+                        error = attempt.exception()
+                raise error
+            finally:
+                for attempt in pending:
+                    attempt.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def _send_once(self, agent_id: str, slot: dict, model: str, message: str) -> str:
+        """在單一模型的 Session 上發送訊息並記錄延遲"""
+        from copilot.generated.session_events import SessionEventType
+        
+        agent = self.agents[agent_id]
+        session = await self.get_session(agent_id, slot, model)
+        context = slot["contexts"][model]
+        context["task"] = None
+        context["claimed"] = []
+        
         response_parts = []
         done_event = asyncio.Event()
         
@@ -306,27 +744,41 @@ class MultiAgentFactory:
             if event.type == SessionEventType.SESSION_IDLE:
                 done_event.set()
         
-        agent["session"].on(handle_event)
-        await agent["session"].send({"prompt": message})
-        await done_event.wait()
+        unsubscribe = session.on(self.profiler.wrap(f"{agent_id}.handle_event", handle_event))
+        started = time.perf_counter()
+        try:
+            await session.send({"prompt": message})
+            await done_event.wait()
+            self.router.record(model, agent_id, time.perf_counter() - started)
+        except asyncio.CancelledError:
+            # 被對沖淘汰：已等待時間只是延遲下限，另外記錄而不列入樣本；中止模型端的生成，
+            # 並把這次領取但未完成的任務退回，避免永遠停在進行中
+            self.router.record_cancelled(model, agent_id, time.perf_counter() - started)
+            await session.abort()
+            for task in context["claimed"]:
+                slot["board"].release(task)
+            raise
+        finally:
+            unsubscribe()
         
         return "".join(response_parts)
     
-    async def assign_tasks(self, requirement: str):
+    async def assign_tasks(self, board: TaskBoard, requirement: str):
         """監工分配任務"""
-        print("\n👷 [監工] 分析需求並分配任務...\n")
+        print(f"\n👷 [{board.cycle_id}][監工] 分析需求並分配任務...\n")
         
         response = await self.send_to_agent(
             "supervisor",
-            f"請分析以下需求，並建立適當的任務分配給 Worker：\n\n{requirement}"
+            f"請分析以下需求，並建立適當的任務分配給 Worker：\n\n{requirement}",
+            board,
         )
         
-        print(f"\n📋 監工回應:\n{response}")
+        print(f"\n📋 [{board.cycle_id}] 監工回應:\n{response}")
         return response
     
-    async def workers_execute(self):
+    async def workers_execute(self, board: TaskBoard):
         """Workers 並行工作"""
-        print("\n👨‍💻 [Workers] 開始並行執行任務...\n")
+        print(f"\n👨‍💻 [{board.cycle_id}][Workers] 開始並行執行任務...\n")
         
         worker_ids = ["worker-frontend", "worker-backend", "worker-styling"]
         
@@ -336,72 +788,130 @@ class MultiAgentFactory:
             if not agent:
                 return None
             
-            print(f"  🚀 {agent['role']} 開始工作...")
+            print(f"  🚀 [{board.cycle_id}] {agent['role']} 開始工作...")
             
             response = await self.send_to_agent(
                 worker_id,
-                "請領取一個適合你的任務並完成它。完成後回報結果。"
+                "請領取一個適合你的任務並完成它。完成後回報結果。",
+                board,
             )
             
-            print(f"  ✅ {agent['role']} 完成工作")
+            print(f"  ✅ [{board.cycle_id}] {agent['role']} 完成工作")
             return {"worker_id": worker_id, "role": agent["role"], "response": response}
         
         results = await asyncio.gather(*[worker_task(wid) for wid in worker_ids])
         return [r for r in results if r]
     
-    async def run_all_tests(self):
+    async def run_all_tests(self, board: TaskBoard):
         """測試員執行測試"""
-        print("\n🧪 [測試員] 開始執行自動化測試...\n")
+        print(f"\n🧪 [{board.cycle_id}][測試員] 開始執行自動化測試...\n")
         
         response = await self.send_to_agent(
             "tester",
-            "請執行所有類型的測試（unit, integration, e2e），並回報測試結果。"
+            "請執行所有類型的測試（unit, integration, e2e），並回報測試結果。",
+            board,
         )
         
-        print(f"\n📊 測試報告:\n{response}")
+        # 對沖淘汰的請求可能退回測試任務，再請測試員處理
+        iterations = 0
+        while iterations < 2 and any(
+            t.type == TaskType.TEST and t.status == TaskStatus.PENDING for t in board.task_queue
+        ):
+            response = await self.send_to_agent(
+                "tester",
+                "請領取剩餘的 test 任務並執行測試，回報測試結果。",
+                board,
+            )
+            iterations += 1
+        
+        print(f"\n📊 [{board.cycle_id}] 測試報告:\n{response}")
         return response
     
-    async def run_development_cycle(self, requirement: str):
-        """完整開發流程"""
+    async def run_development_cycle(self, requirement: str, cache_path: Optional[str] = None) -> TaskBoard:
+        """完整開發流程 (每個週期擁有獨立的 TaskBoard，可與其他週期並行)
+
+        指定 cache_path 時為增量模式：需求每行一個項目 (見 split_requirement)，
+        有變更的項目一次送給監工拆解，任務輸入未變的沿用上次結果，
+        測試只在有任務重新執行時才跑。未標示項目編號的任務不會被快取。
+        """
+        board = TaskBoard(f"cycle-{next(self._cycle_ids)}")
+        cache = CycleCache(cache_path) if cache_path else None
+        
         print("=" * 60)
-        print("🎮 BlogSys 多 Agent 開發系統")
+        print(f"🎮 BlogSys 多 Agent 開發系統 [{board.cycle_id}]")
         print("=" * 60)
         print(f"\n📝 需求: {requirement}\n")
         
         # Step 1: 監工分析並分配任務
-        await self.assign_tasks(requirement)
+        if cache:
+            changed = cache.plan(board, requirement)
+            print(f"♻️ 需求項目: {len(board.items)}，變更: {len(changed)}，沿用任務: {len(board.completed_tasks)}")
+            if changed:
+                board.item_labels = {i: item for i, item in enumerate(changed, 1)}
+                listing = "\n".join(f"[{i}] {board.items[item]}" for i, item in board.item_labels.items())
+                await self.assign_tasks(
+                    board,
+                    f"{requirement}\n\n本次只需為以下新增或修改的需求項目建立任務，"
+                    f"並在 create_task 的 item 填入對應編號：\n{listing}",
+                )
+                board.item_labels = {}
+            board.invalidate_tests()
+        else:
+            await self.assign_tasks(board, requirement)
         
         # Step 2: Workers 並行開發
-        await self.workers_execute()
+        if cache is None or board.count(TaskStatus.PENDING) > 0:
+            await self.workers_execute(board)
         
         # Step 3: 再次檢查是否有待處理任務
         iterations = 0
         while iterations < 3:
-            pending_count = len([t for t in task_queue if t.status == TaskStatus.PENDING])
-            if pending_count > 0:
-                await self.workers_execute()
+            if board.count(TaskStatus.PENDING) > 0:
+                await self.workers_execute(board)
             else:
                 break
             iterations += 1
         
-        # Step 4: 測試員執行測試
-        await self.run_all_tests()
+        # Step 4: 測試員執行測試 (增量模式下沒有任何任務重新執行時沿用上次報告)
+        if cache and cache.test_report and not board.fresh_tasks():
+            test_report = cache.test_report
+            print(f"\n♻️ [{board.cycle_id}] 沒有變更，沿用上次測試報告")
+        else:
+            test_report = await self.run_all_tests(board)
+        
+        if cache:
+            cache.save(board, test_report)
         
         # Step 5: 最終報告
         print("\n" + "=" * 60)
-        print("📋 開發完成報告")
+        print(f"📋 開發完成報告 [{board.cycle_id}]")
         print("=" * 60)
-        print(f"✅ 完成任務: {len(completed_tasks)}")
-        print(f"⏳ 待處理: {len([t for t in task_queue if t.status == TaskStatus.PENDING])}")
-        print(f"🔄 進行中: {len([t for t in task_queue if t.status == TaskStatus.IN_PROGRESS])}")
+        print(f"✅ 完成任務: {len(board.completed_tasks)}")
+        print(f"♻️ 沿用: {len(board.task_queue) - len(board.fresh_tasks())}")
+        print(f"⏳ 待處理: {board.count(TaskStatus.PENDING)}")
+        print(f"🔄 進行中: {board.count(TaskStatus.IN_PROGRESS)}")
+        print("\n⏱️ 模型延遲:")
+        for line in self.router.summary():
+            print(f"  {line}")
+        
+        return board
+    
+    async def run_development_cycles(self, requirements: List[str]) -> List[TaskBoard]:
+        """在同一組 Agent 副本上並行執行多個開發週期"""
+        return await asyncio.gather(*[self.run_development_cycle(r) for r in requirements])
     
     async def shutdown(self):
         """關閉所有 Agent"""
         print("\n🛑 關閉所有 Agent...")
         for agent_id, agent in self.agents.items():
-            await agent["session"].destroy()
+            for slot in agent["slots"]:
+                for session in slot["sessions"].values():
+                    await session.destroy()
             print(f"  ✓ {agent['role']} 已下線")
         await self.client.stop()
+        await self.profiler.stop()
+        self.profiler.report()
+        self.profiler.dump("factory-profile")
         print("✅ 系統已關閉\n")
 
 
@@ -410,7 +920,11 @@ class MultiAgentFactory:
 # ============================================================================
 
 async def main():
-    factory = MultiAgentFactory()
+    # 對沖 Worker 與測試員：慢的 Worker 會拖住 workers_execute 的 gather，
+    # 被淘汰請求領取的任務會退回待處理，由下一輪 Worker 重新領取
+    factory = MultiAgentFactory(
+        hedge_roles={"worker-frontend", "worker-backend", "worker-styling", "tester"},
+    )
     
     try:
         # 初始化所有 Agent
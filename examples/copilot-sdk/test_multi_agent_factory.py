@@ -0,0 +1,66 @@
+"""
+增量開發週期快取 (CycleCache) 的測試
+
+執行方式：
+python -m pytest test_multi_agent_factory.py
+"""
+
+from multi_agent_factory import CycleCache, TaskBoard, TaskType
+
+
+REQUIREMENT = """
+    為 BlogSys 開發一個「AI 助手」功能：
+    1. 前端：建立一個聊天介面元件，Cyberpunk 風格
+    2. 後端：建立 /api/assistant API Route
+"""
+
+
+def run_cycle(cache_path, requirement, labels):
+    """模擬一次增量週期：依 labels 為變更項目建立任務並全部完成，回傳 (變更項目, board)"""
+    cache = CycleCache(cache_path)
+    board = TaskBoard("cycle-test")
+    changed = cache.plan(board, requirement)
+    board.item_labels = {i: item for i, item in enumerate(changed, 1)}
+    for type, description, label in labels:
+        task = board.create(type, description, board.item_for(label))
+        if not task.reused:
+            board.complete(task.id, f"done: {description}")
+    board.item_labels = {}
+    cache.save(board, "all tests passed")
+    return changed, board
+
+
+def test_item_without_tasks_is_not_cached(tmp_path):
+    cache_path = str(tmp_path / "cache.json")
+
+    # 後端任務未填項目編號，且有兩個變更項目，無法歸屬
+    changed, _ = run_cycle(cache_path, REQUIREMENT, [
+        (TaskType.FRONTEND, "聊天介面元件", 1),
+        (TaskType.BACKEND, "/api/assistant", None),
+    ])
+    assert len(changed) == 2
+
+    cache = CycleCache(cache_path)
+    assert len(cache.items) == 1
+
+    changed, board = run_cycle(cache_path, REQUIREMENT, [])
+    assert len(changed) == 1
+    assert "後端" in board.items[changed[0]]
+
+
+def test_context_change_invalidates_all_items(tmp_path):
+    cache_path = str(tmp_path / "cache.json")
+    labels = [
+        (TaskType.FRONTEND, "聊天介面元件", 1),
+        (TaskType.BACKEND, "/api/assistant", 2),
+    ]
+    run_cycle(cache_path, REQUIREMENT, labels)
+
+    changed, board = run_cycle(cache_path, REQUIREMENT, labels)
+    assert changed == []
+    assert len(board.fresh_tasks()) == 0
+
+    # 只修改標題行：所有項目都要重新拆解，任務結果也不沿用
+    changed, board = run_cycle(cache_path, REQUIREMENT.replace("AI 助手", "翻譯工具"), labels)
+    assert len(changed) == 2
+    assert len(board.fresh_tasks()) == 2